@@ -8,34 +8,302 @@ Improvements:
 TODO: Make the leagues we need to update in main lambda_handler a pydantic object instead of dictionary to make following the code easier.
 """
 
-import json
-from typing import Optional, Dict, List
+from __future__ import annotations
+
+import asyncio
+import atexit
+import itertools
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
 import os
 import logging
 import time
+from collections import deque
 from datetime import datetime
-from io import StringIO
+from tempfile import SpooledTemporaryFile
 import sys
 
-import requests
-import pandas as pd
+import aiohttp
+import orjson
 import boto3
+from boto3.s3.transfer import TransferConfig
+import botocore
+from botocore.config import Config
+
+# pandas is imported only when it is needed as the import alone slows down cold starts
+if TYPE_CHECKING:
+    import pandas as pd
 
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 
 RAPID_API_KEY = os.environ.get("RAPID_API_KEY")
 DESTINATION_BUCKET = os.environ.get("DESTINATION_BUCKET")
 MAX_UPDATES = int(os.environ.get("MAX_UPDATES", 1))
-SLEEP_TIME_BETWEEN_CALLS_SECONDS = int(
-    os.environ.get("SLEEP_TIME_BETWEEN_CALLS_SECONDS", 5)
-)
+MAX_CALLS_PER_MINUTE = int(os.environ.get("MAX_CALLS_PER_MINUTE", 10))
+# How many API calls can be in flight at the same time, size this to the API plan.
+# The limit is adapted between these bounds based on the latency and errors of the API
+MIN_CONCURRENT_REQUESTS = int(os.environ.get("MIN_CONCURRENT_REQUESTS", 1))
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("MAX_CONCURRENT_REQUESTS", 2))
+TARGET_LATENCY_SECONDS = float(os.environ.get("TARGET_LATENCY_SECONDS", 2))
+# Time left at the end of the invocation for processing the data which has been fetched
+PROCESSING_MARGIN_SECONDS = 30
+# Explicit timeout for a single API call, aiohttp's default equals the lambda timeout
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("HTTP_TIMEOUT_SECONDS", 30))
+
+API_SITE = "https://v3.football.api-sports.io/"
 
 SEASON_META_TABLE = os.environ.get("SEASONS_META_TABLE")
 
-dynamodb = boto3.resource("dynamodb")
-SEASON_META_TABLE = dynamodb.Table(SEASON_META_TABLE)
+BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+)
+
+_season_meta_table = None
+_s3_resource = None
 
-s3_resource = boto3.resource("s3")
+
+def get_season_meta_table():
+    """
+    Returns the shared DynamoDB seasons meta table resource, creating it on first use.
+    """
+    global _season_meta_table
+    if _season_meta_table is None:
+        dynamodb = boto3.resource("dynamodb", config=BOTO_CONFIG)
+        _season_meta_table = dynamodb.Table(SEASON_META_TABLE)
+    return _season_meta_table
+
+
+def get_s3_resource():
+    """
+    Returns the shared S3 resource, creating it on first use.
+    """
+    global _s3_resource
+    if _s3_resource is None:
+        _s3_resource = boto3.resource("s3", config=BOTO_CONFIG)
+    return _s3_resource
+
+
+# Files up to this size are kept in memory and uploaded with a single PUT,
+# larger ones are spilled to disk and uploaded in multiple parts
+UPLOAD_CHUNK_SIZE_BYTES = 5 * 1024 * 1024
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=UPLOAD_CHUNK_SIZE_BYTES,
+    multipart_chunksize=UPLOAD_CHUNK_SIZE_BYTES,
+    use_threads=True,
+)
+
+# The event loop and the HTTP session are kept on module level so warm lambda
+# invocations can reuse the open connections to the API.
+EVENT_LOOP = asyncio.new_event_loop()
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Returns the shared aiohttp session, creating it on first use.
+
+    Returns:
+        aiohttp.ClientSession: Session with the API headers already set.
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS),
+            headers={
+                "x-rapidapi-host": "v3.football.api-sports.io",
+                "x-rapidapi-key": RAPID_API_KEY,
+            },
+        )
+    return _http_session
+
+
+def close_http_session() -> None:
+    """
+    Closes the shared aiohttp session when the lambda execution environment shuts down.
+    """
+    if _http_session is not None and not _http_session.closed:
+        EVENT_LOOP.run_until_complete(_http_session.close())
+
+
+# The session is closed only at exit, not after each invocation, to keep the
+# connections open for the next warm invocation
+atexit.register(close_http_session)
+
+
+class RateLimitExhausted(Exception):
+    """
+    Raised when the API limits would only reset after the invocation has timed out.
+    """
+
+
+class RateLimiter:
+    """
+    Keeps the calls to the API under the limits of the API plan.
+
+    Proactively keeps a sliding window of the timestamps of our own calls so we never
+    make more than max_calls calls within period_seconds. Reactively reads the rate limit
+    headers returned by the API and waits for the reset only when the API tells us
+    there is no budget left. If the wait would go past the deadline of the invocation
+    the call is not made at all.
+    """
+
+    def __init__(self, max_calls: int, period_seconds: float = 60):
+        self.max_calls = max_calls
+        self.period_seconds = period_seconds
+        self.call_times = deque()
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def seconds_to_wait(self) -> float:
+        """
+        Returns the minimum time we need to wait before the next call.
+        """
+        now = time.monotonic()
+        while self.call_times and now - self.call_times[0] >= self.period_seconds:
+            self.call_times.popleft()
+
+        wait = 0.0
+        if len(self.call_times) >= self.max_calls:
+            wait = self.call_times[0] + self.period_seconds - now
+        if self.remaining == 0 and self.reset_at is not None:
+            wait = max(wait, self.reset_at - now)
+        return max(0.0, wait)
+
+    async def wait_if_throttled(self, deadline: Optional[float] = None) -> None:
+        """
+        Sleeps only as long as needed to stay under the limits and reserves a call.
+
+        Args:
+            deadline: time.monotonic() value after which we should not be waiting
+                anymore, None for no deadline.
+
+        Raises:
+            RateLimitExhausted: If the wait would end after the deadline.
+        """
+        async with self._lock:
+            wait = self.seconds_to_wait()
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitExhausted(
+                    f"API limits reset in {wait:.0f} seconds, after the deadline"
+                )
+            if wait > 0:
+                logging.debug(f"Rate limited, waiting {wait:.2f} seconds")
+                await asyncio.sleep(wait)
+            self.call_times.append(time.monotonic())
+
+    def update_from_headers(self, headers) -> None:
+        """
+        Updates the remaining calls and the reset time from the API response headers.
+        """
+        remaining = headers.get("x-ratelimit-requests-remaining")
+        reset = headers.get("x-ratelimit-requests-reset")
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset is not None:
+            # The reset header tells the seconds until the limits are reset
+            self.reset_at = time.monotonic() + int(reset)
+
+
+RATE_LIMITER = RateLimiter(max_calls=MAX_CALLS_PER_MINUTE)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits how many calls are made to the API at the same time and adapts the limit
+    with AIMD (additive-increase / multiplicative-decrease).
+
+    The limit starts from max_limit. Every 429 / 5xx response or failed call halves the
+    limit and every window_size successful responses the limit is increased by one if
+    their mean latency stayed under the target. The limit always stays between
+    min_limit and max_limit.
+    """
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        target_latency_seconds: float,
+        window_size: int = 5,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.target_latency_seconds = target_latency_seconds
+        self.latencies = deque(maxlen=window_size)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """
+        Waits until there is room for one more call under the current limit.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, latency_seconds: float, status_code: Optional[int]) -> None:
+        """
+        Frees the room of a finished call and adapts the limit based on its result.
+
+        Args:
+            latency_seconds: How long the call took.
+            status_code: The status code of the response, None if the call failed.
+        """
+        async with self._condition:
+            self.in_flight -= 1
+            self._adapt_limit(latency_seconds, status_code)
+            self._condition.notify_all()
+
+    async def cancel(self) -> None:
+        """
+        Frees the room of a call which was never made without adapting the limit.
+        """
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _adapt_limit(self, latency_seconds: float, status_code: Optional[int]) -> None:
+        if status_code is None or status_code == 429 or status_code >= 500:
+            self.limit = max(self.min_limit, self.limit // 2)
+            self.latencies.clear()
+            logging.info(f"API is struggling, lowering concurrency to {self.limit}")
+            return
+
+        self.latencies.append(latency_seconds)
+        if len(self.latencies) == self.latencies.maxlen:
+            mean_latency = sum(self.latencies) / len(self.latencies)
+            if mean_latency <= self.target_latency_seconds:
+                self.limit = min(self.max_limit, self.limit + 1)
+            self.latencies.clear()
+
+
+CONCURRENCY_LIMITER = AdaptiveConcurrencyLimiter(
+    min_limit=MIN_CONCURRENT_REQUESTS,
+    max_limit=MAX_CONCURRENT_REQUESTS,
+    target_latency_seconds=TARGET_LATENCY_SECONDS,
+)
+
+
+FIXTURE_COLUMNS = [
+    "game_id",
+    "game_date",
+    "league_id",
+    "league_name",
+    "league_season",
+    "teams_home_id",
+    "teams_home_name",
+    "teams_away_id",
+    "teams_away_name",
+    "score_ht_home",
+    "score_ft_home",
+    "score_ht_away",
+    "score_ft_away",
+]
+TEAMS_KEY = "teams/{league_id}/{season_year}/data.csv"
+TEAM_COLUMNS = ["team_id", "team_name", "team_code", "team_logo", "team_country"]
 
 
 def upload_df_to_s3(bucket_name: str, key: str, df: pd.DataFrame) -> None:
@@ -50,15 +318,18 @@ def upload_df_to_s3(bucket_name: str, key: str, df: pd.DataFrame) -> None:
     Returns:
         None
     """
-    # Convert dataframe to text file in memory to be able to write it to S3
-    csv_buffer = StringIO()
-    df.to_csv(csv_buffer, index=False, sep=";")
+    with SpooledTemporaryFile(max_size=UPLOAD_CHUNK_SIZE_BYTES, mode="w+b") as buffer:
+        df.to_csv(buffer, index=False, sep=";", encoding="utf-8", chunksize=10_000)
+        buffer.seek(0)
 
-    # Upload the text file from memory to S3
-    s3_resource.Object(bucket_name, key).put(Body=csv_buffer.getvalue())
+        get_s3_resource().meta.client.upload_fileobj(
+            buffer, bucket_name, key, Config=S3_TRANSFER_CONFIG
+        )
 
 
-def get_data(league_id: int, season: int, endpoint: str) -> Optional[List[Dict]]:
+async def get_data(
+    league_id: int, season: int, endpoint: str, deadline: Optional[float] = None
+) -> Optional[List[Dict]]:
     """
     Retrieves data from the API for a specific league, season, and endpoint.
 
@@ -67,39 +338,48 @@ def get_data(league_id: int, season: int, endpoint: str) -> Optional[List[Dict]]
         season: The year of the season.
         endpoint: The API endpoint to retrieve data from.
             Valid values are 'fixtures' or 'teams'.
+        deadline: time.monotonic() value after which no new calls are started.
 
     Returns:
         A dictionary containing the response data from the API.
         If no data is found or an error occurs, will return None.
-    """
-    headers = {
-        "x-rapidapi-host": "v3.football.api-sports.io",
-        "x-rapidapi-key": RAPID_API_KEY,
-    }
-    session = requests.Session()
-    site = "https://v3.football.api-sports.io/"
 
+    Raises:
+        RateLimitExhausted: If the API limits would reset only after the deadline.
+    """
     params = {"league": int(league_id), "season": int(season)}
 
-    # warning: this logs the API-key, TODO: fix later to mask the API-key.
-    logging.debug(headers, params, endpoint)
-
-    response = session.get(site + endpoint, headers=headers, params=params)
-
-    logging.debug(response.text)
-    logging.debug(response.json())
-
-    data = None
-    if response.status_code == 200:
-        if len(response.json()["response"]) > 0:
-            data = response.json()["response"]
-        else:
-            logging.info(
-                f"No {endpoint} found for league_id={league_id} season={season}"
-            )
-            logging.info(response.json()["response"])
-    else:
-        logging.info(f"Error, API responded with: {response.status_code}")
+    logging.debug(f"{endpoint}: {params}")
+
+    await CONCURRENCY_LIMITER.acquire()
+    try:
+        await RATE_LIMITER.wait_if_throttled(deadline)
+    except BaseException:
+        # No request was sent so there is nothing to adapt the limit on
+        await CONCURRENCY_LIMITER.cancel()
+        raise
+
+    session = get_http_session()
+    status_code = None
+    start_time = time.monotonic()
+    try:
+        async with session.get(API_SITE + endpoint, params=params) as response:
+            status_code = response.status
+            RATE_LIMITER.update_from_headers(response.headers)
+            if response.status != 200:
+                logging.info(f"Error, API responded with: {response.status}")
+                return None
+            # Parse the body only once, it can be hundreds of kilobytes for fixtures
+            payload = orjson.loads(await response.read())
+    finally:
+        await CONCURRENCY_LIMITER.release(time.monotonic() - start_time, status_code)
+
+    logging.debug(payload)
+    data = payload.get("response", [])
+    if not data:
+        logging.info(f"No {endpoint} found for league_id={league_id} season={season}")
+        logging.info(payload.get("errors"))
+        return None
     return data
 
 
@@ -114,31 +394,31 @@ def process_fixtures_to_df(fixtures_json: dict) -> pd.DataFrame:
         pd.DataFrame: A DataFrame containing the processed fixtures data.
 
     """
-    df = pd.json_normalize(fixtures_json)
-    df.columns = (
-        df.columns.str.replace(".", "_", regex=False)
-        .str.replace("fixture", "game")
-        .str.replace("halftime", "ht")
-        .str.replace("fulltime", "ft")
-    )
-    df = df[
+    import pandas as pd
+
+    # Pick only the fields we need instead of normalizing the whole nested response
+    df = pd.DataFrame.from_records(
         [
-            "game_id",
-            "game_date",
-            "league_id",
-            "league_name",
-            "league_season",
-            "teams_home_id",
-            "teams_home_name",
-            "teams_away_id",
-            "teams_away_name",
-            "score_ht_home",
-            "score_ft_home",
-            "score_ht_away",
-            "score_ft_away",
-        ]
-    ]
-    df["game_date"] = pd.to_datetime(df["game_date"])
+            (
+                fixture["fixture"]["id"],
+                fixture["fixture"]["date"],
+                fixture["league"]["id"],
+                fixture["league"]["name"],
+                fixture["league"]["season"],
+                fixture["teams"]["home"]["id"],
+                fixture["teams"]["home"]["name"],
+                fixture["teams"]["away"]["id"],
+                fixture["teams"]["away"]["name"],
+                fixture["score"]["halftime"]["home"],
+                fixture["score"]["fulltime"]["home"],
+                fixture["score"]["halftime"]["away"],
+                fixture["score"]["fulltime"]["away"],
+            )
+            for fixture in fixtures_json
+        ],
+        columns=FIXTURE_COLUMNS,
+    )
+    df["game_date"] = pd.to_datetime(df["game_date"], format="ISO8601", utc=True)
 
     return df
 
@@ -155,12 +435,22 @@ def process_teams_to_df(teams_json: dict) -> pd.DataFrame:
         with columns:
             ["team_id", "team_name", "team_code", "team_logo", "team_country"]
     """
-    # Convert json to dataframe
-    df = pd.json_normalize(teams_json)
-    df.columns = df.columns.str.replace(".", "_", regex=False)
+    import pandas as pd
 
-    # Select only the columns we need
-    df = df[["team_id", "team_name", "team_code", "team_logo", "team_country"]]
+    # Pick only the fields we need instead of normalizing the whole nested response
+    df = pd.DataFrame.from_records(
+        [
+            (
+                team["team"]["id"],
+                team["team"]["name"],
+                team["team"]["code"],
+                team["team"]["logo"],
+                team["team"]["country"],
+            )
+            for team in teams_json
+        ],
+        columns=TEAM_COLUMNS,
+    )
 
     return df
 
@@ -197,30 +487,171 @@ def get_leagues_to_update(table, limit: int = MAX_UPDATES):
         IndexName="LastUpdatedIndex",
         KeyConditionExpression="data_need_to_update = :val",
         ExpressionAttributeValues={":val": 1},
+        # Fetch only the attributes we use to keep the responses small
+        ProjectionExpression=(
+            "league_id, season_year, start_date, end_date,"
+            " last_updated_posteriors, last_updated_teams"
+        ),
         ScanIndexForward=False,
         Limit=limit,
     )
     return response["Items"]
 
 
-def fetch_and_upload_teams(league_id: int, season_year: int):
+async def fetch_league_data(
+    league_id: int,
+    season_year: int,
+    fetch_teams: bool,
+    start_date: str,
+    deadline: Optional[float] = None,
+) -> Tuple[Optional[List[Dict]], Optional[List[Dict]], Optional[str]]:
+    """
+    Fetches the teams and fixtures of one league / season from the API concurrently.
+
+    Args:
+        league_id (int): The ID of the league.
+        season_year (int): The year of the season.
+        fetch_teams (bool): If False only the fixtures are fetched.
+        start_date (str): Start date of the season. Teams already uploaded to S3 after
+            this date are not fetched again.
+        deadline (Optional[float]): time.monotonic() value after which no new calls
+            are started.
+
+    Returns:
+        Tuple of (teams, fixtures, teams_uploaded_date). teams is None if they were not
+        fetched, teams_uploaded_date is the date of the teams already in S3 when
+        fetching them was skipped because of those, otherwise None.
     """
-    Fetches teams from the API and uploads them to S3.
+    teams_uploaded_date = None
+    if fetch_teams:
+        # The teams might already be in S3 without the meta table knowing about it,
+        # in that case we can save the API call. The check blocks, so it is run in a
+        # thread to do the checks of all the leagues concurrently.
+        s3_client = get_s3_resource().meta.client
+        uploaded_date = await asyncio.to_thread(
+            get_teams_uploaded_date, s3_client, league_id, season_year
+        )
+        if uploaded_date is not None and uploaded_date >= start_date:
+            fetch_teams = False
+            teams_uploaded_date = uploaded_date
+
+    logging.info(f"Pulling data, league_id={league_id} & season_year={season_year}")
+    fixtures_call = get_data(league_id, season_year, "fixtures", deadline)
+    if not fetch_teams:
+        return None, await fixtures_call, teams_uploaded_date
+
+    teams, fixtures = await asyncio.gather(
+        get_data(league_id, season_year, "teams", deadline), fixtures_call
+    )
+    return teams, fixtures, None
+
+
+async def fetch_leagues_data(
+    leagues: List[Tuple[int, int, bool, str]], deadline: Optional[float] = None
+) -> List[Tuple[Optional[List[Dict]], Optional[List[Dict]], Optional[str]]]:
+    """
+    Fetches the data of all the given leagues from the API concurrently.
+
+    Args:
+        leagues (List[Tuple[int, int, bool, str]]): (league_id, season_year, fetch_teams,
+            start_date) for each league we need to update.
+        deadline (Optional[float]): time.monotonic() value after which no new calls
+            are started.
+
+    Returns:
+        List of (teams, fixtures, teams_uploaded_date) tuples in the same order as the
+        leagues. If fetching a league failed its item is the raised exception instead,
+        so one failing league does not stop the others from being processed.
+    """
+    return await asyncio.gather(
+        *[fetch_league_data(*league, deadline=deadline) for league in leagues],
+        return_exceptions=True,
+    )
+
+
+def upload_teams(league_id: int, season_year: int, teams_json: List[Dict]):
+    """
+    Uploads the teams fetched from the API to S3.
 
     Args:
         league_id (int): The ID of the league.
         season_year (int): The year of the season.
+        teams_json (List[Dict]): The teams response from the API.
 
     Returns:
         None
     """
-    teams = get_data(league_id, season_year, endpoint="teams")
-    teams = process_teams_to_df(teams)
+    teams = process_teams_to_df(teams_json)
     upload_df_to_s3(
-        DESTINATION_BUCKET, f"teams/{league_id}/{season_year}/data.csv", df=teams
+        DESTINATION_BUCKET,
+        TEAMS_KEY.format(league_id=league_id, season_year=season_year),
+        df=teams,
     )
 
 
+def get_teams_uploaded_date(
+    s3_client, league_id: int, season_year: int
+) -> Optional[str]:
+    """
+    Checks when the teams of a league / season were last uploaded to S3
+    without downloading them.
+
+    Args:
+        s3_client: S3 client, unlike resources clients are thread safe.
+        league_id (int): The ID of the league.
+        season_year (int): The year of the season.
+
+    Returns:
+        The upload date as a "%Y-%m-%d" string, None if the teams are not in S3.
+    """
+    try:
+        response = s3_client.head_object(
+            Bucket=DESTINATION_BUCKET,
+            Key=TEAMS_KEY.format(league_id=league_id, season_year=season_year),
+        )
+    except botocore.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return None
+        raise
+    return response["LastModified"].strftime("%Y-%m-%d")
+
+
+def build_update_expression(
+    update_teams: bool, update_posteriors: bool, remove_data_need_to_update: bool
+) -> str:
+    """
+    Builds the update expression used in update_the_dymamodb_meta_table.
+
+    Args:
+        update_teams (bool): Whether to set the last_updated_teams value.
+        update_posteriors (bool): Whether to set the posteriors_need_to_update value.
+        remove_data_need_to_update (bool): Whether to remove the data_need_to_update value.
+
+    Returns:
+        str: The update expression.
+    """
+    set_actions = [
+        "last_updated_fixtures = :last_updated_fixtures",
+        "newest_game_date = :newest_game_date",
+    ]
+    if update_teams:
+        set_actions.append("last_updated_teams = :last_updated_teams")
+    if update_posteriors:
+        set_actions.append("posteriors_need_to_update = :posteriors_need_to_update")
+
+    update_expression = "SET " + ", ".join(set_actions)
+    if remove_data_need_to_update:
+        update_expression += " REMOVE data_need_to_update"
+    return update_expression
+
+
+# All the possible update expressions, keyed by the arguments of build_update_expression
+UPDATE_EXPRESSIONS = {
+    flags: build_update_expression(*flags)
+    for flags in itertools.product([False, True], repeat=3)
+}
+
+
 def update_the_dymamodb_meta_table(
     table,
     league_id: int,
@@ -239,30 +670,22 @@ def update_the_dymamodb_meta_table(
         - update the "last_updated_teams" and "last_updated_fixtures" to current date
     """
 
-    update_expression = """
-    set
-        last_updated_fixtures = :last_updated_fixtures,
-        newest_game_date = :newest_game_date
-    """
-
     new_values = {
         ":last_updated_fixtures": last_updated_fixtures,
         ":newest_game_date": newest_game_date,
     }
-
     if last_updated_teams is not None:
-        update_expression += ",\n\tlast_updated_teams = :last_updated_teams"
         new_values[":last_updated_teams"] = last_updated_teams
-
     if posteriors_need_to_update:
-        update_expression += (
-            ",\n\tposteriors_need_to_update = :posteriors_need_to_update"
-        )
         new_values[":posteriors_need_to_update"] = 1
 
-    if data_need_to_update is False:
-        update_expression += "\n\t REMOVE data_need_to_update"
-
+    update_expression = UPDATE_EXPRESSIONS[
+        (
+            last_updated_teams is not None,
+            bool(posteriors_need_to_update),
+            not data_need_to_update,
+        )
+    ]
     logging.debug(update_expression)
 
     return table.update_item(
@@ -283,18 +706,11 @@ def get_newest_game_date(fixture_df: pd.DataFrame) -> str:
     Returns:
     str: The date of the most recent game in the fixture dataframe.
     """
-    return (
-        fixture_df.assign(day=fixture_df["game_date"].dt.strftime("%Y-%m-%d"))[
-            ["day", "score_ft_home"]
-        ]
-        .groupby("day")
-        .agg(  # There is future games which does not yet have scores
-            lambda x: not x.isna().any()
-        )
-        .reset_index()
-        .query("score_ft_home")["day"]
-        .max()
-    )
+    day = fixture_df["game_date"].dt.strftime("%Y-%m-%d")
+    # There is future games which does not yet have scores, keep only the days
+    # where all the games have been played
+    all_games_played = fixture_df["score_ft_home"].notna().groupby(day).transform("all")
+    return day[all_games_played].max()
 
 
 def lambda_handler(event, context):
@@ -305,35 +721,79 @@ def lambda_handler(event, context):
     """
     todays_date = datetime.now().strftime("%Y-%m-%d")
 
-    leagues_we_need_to_update = get_leagues_to_update(table=SEASON_META_TABLE)
+    season_meta_table = get_season_meta_table()
+    leagues_we_need_to_update = get_leagues_to_update(table=season_meta_table)
     logging.info(f"Leagues we need to update: {leagues_we_need_to_update}")
-
+    if not leagues_we_need_to_update:
+        # Nothing to update, return before doing any of the heavier work
+        return {
+            "statusCode": 200,
+            "body": orjson.dumps({"leagues_updated": ""}).decode(),
+        }
+
+    leagues_to_fetch = []
     for league_which_needs_updating in leagues_we_need_to_update:
+        start_date = league_which_needs_updating["start_date"]
+        last_updated_teams = league_which_needs_updating.get("last_updated_teams")
+        # update teams if we have not updated them after the season has started
+        fetch_teams = last_updated_teams is None or last_updated_teams < start_date
+        leagues_to_fetch.append(
+            (
+                int(league_which_needs_updating["league_id"]),
+                int(league_which_needs_updating["season_year"]),
+                fetch_teams,
+                start_date,
+            )
+        )
+
+    # Stop calling the API in time to process what we have fetched before the timeout
+    deadline = None
+    if context is not None:
+        deadline = (
+            time.monotonic()
+            + context.get_remaining_time_in_millis() / 1000
+            - PROCESSING_MARGIN_SECONDS
+        )
+    leagues_data = EVENT_LOOP.run_until_complete(
+        fetch_leagues_data(leagues_to_fetch, deadline)
+    )
+
+    leagues_updated = []
+    for league_which_needs_updating, league_data in zip(
+        leagues_we_need_to_update, leagues_data
+    ):
         season_year = int(league_which_needs_updating["season_year"])
         league_id = int(league_which_needs_updating["league_id"])
 
-        start_date = league_which_needs_updating["start_date"]
+        # Skip the league without touching the meta table, it is retried on the next run
+        if isinstance(league_data, BaseException):
+            logging.error(
+                f"Fetching data failed, league_id={league_id} & season_year={season_year}",
+                exc_info=league_data,
+            )
+            continue
+        teams, fixtures, teams_updated_date = league_data
+        if fixtures is None:
+            logging.error(
+                f"No fixtures received, league_id={league_id} & season_year={season_year}"
+            )
+            continue
+
         end_date = league_which_needs_updating["end_date"]
         last_updated_posteriors = league_which_needs_updating.get(
             "last_updated_posteriors", "2000-01-01"
         )
 
-        logging.info(f"Pulling data, league_id={league_id} & season_year={season_year}")
+        logging.info(
+            f"Processing data, league_id={league_id} & season_year={season_year}"
+        )
         logging.info(f"Last updated posteriors: {last_updated_posteriors}")
 
-        last_updated_teams = league_which_needs_updating.get("last_updated_teams")
-        teams_updated = False
-
-        # update teams if we have not updated them after the season has started
-        if last_updated_teams is None:
-            fetch_and_upload_teams(league_id, season_year)
-            teams_updated = True
-        elif last_updated_teams < start_date:
-            fetch_and_upload_teams(league_id, season_year)
-            teams_updated = True
+        if teams is not None:
+            upload_teams(league_id, season_year, teams)
+            teams_updated_date = todays_date
 
         # update fixtures
-        fixtures = get_data(league_id, season_year, endpoint="fixtures")
         fixtures = process_fixtures_to_df(fixtures)
 
         upload_df_to_s3(
@@ -348,30 +808,29 @@ def lambda_handler(event, context):
         )
 
         update_the_dymamodb_meta_table(
-            table=SEASON_META_TABLE,
+            table=season_meta_table,
             league_id=league_id,
             season_year=season_year,
-            last_updated_teams=todays_date if teams_updated else None,
+            last_updated_teams=teams_updated_date,
             last_updated_fixtures=todays_date,
             newest_game_date=newest_game_date,
             posteriors_need_to_update=last_updated_posteriors < newest_game_date,
             data_need_to_update=data_need_to_update,
         )
-        # TODO: Stop doing this on last item if you want to optimize
-        time.sleep(SLEEP_TIME_BETWEEN_CALLS_SECONDS)
+        leagues_updated.append(league_which_needs_updating)
 
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": orjson.dumps(
             {
                 "leagues_updated": "\n".join(
                     [
                         f"League id: {int(i['league_id'])}, Season year: {int(i['season_year'])}"
-                        for i in leagues_we_need_to_update
+                        for i in leagues_updated
                     ]
                 )
             }
-        ),
+        ).decode(),
     }
 
 
@@ -5,22 +5,93 @@ If the row (league / season) already exists in the database we don't update the
 Run once a week automatically.
 """
 
-from typing import Dict, List
-import json
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+import atexit
 import os
 import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import boto3
+from boto3.dynamodb.types import TypeSerializer
 import botocore
-import pandas as pd
+from botocore.config import Config
+
+# pandas is imported only when it is needed as the import alone slows down cold starts
+if TYPE_CHECKING:
+    import pandas as pd
 
 RAPID_API_KEY = os.environ.get("RAPID_API_KEY")
 SEASON_META_TABLE = os.environ.get("SEASONS_META_TABLE")
 FIRST_YEAR = 2019
+# Use conditional puts instead of batched writes if multiple writers can race each other
+CONDITIONAL_WRITES = bool(int(os.environ.get("CONDITIONAL_WRITES", 0)))
+
+BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+)
+
+# Retries for the items DynamoDB leaves unprocessed in batch requests, botocore does
+# not retry these partial failures
+MAX_BATCH_ATTEMPTS = 8
+BATCH_BACKOFF_BASE_SECONDS = 0.1
+BATCH_BACKOFF_MAX_SECONDS = 5
+# Every worker needs its own connection from the boto3 connection pool
+MAX_WRITE_WORKERS = min(32, BOTO_CONFIG.max_pool_connections)
+
+# Session is kept on module level so warm lambda invocations reuse the connection
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update(
+    {
+        "x-rapidapi-host": "v3.football.api-sports.io",
+        "x-rapidapi-key": RAPID_API_KEY,
+    }
+)
+HTTP_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]
+        ),
+    ),
+)
+atexit.register(HTTP_SESSION.close)
+
+_dynamodb = None
+
+
+def get_dynamodb():
+    """
+    Returns the shared DynamoDB resource, creating it on first use.
+    """
+    global _dynamodb
+    if _dynamodb is None:
+        _dynamodb = boto3.resource("dynamodb", config=BOTO_CONFIG)
+    return _dynamodb
+
 
-dynamodb = boto3.resource("dynamodb")
-SEASON_META_TABLE = dynamodb.Table(SEASON_META_TABLE)
+TYPE_SERIALIZER = TypeSerializer()
+
+
+def sleep_before_retry(attempt: int) -> None:
+    """
+    Sleeps with exponential backoff and full jitter before retrying a batch request.
+
+    Parameters:
+    - attempt: How many times the request has been attempted already.
+    """
+    backoff = min(BATCH_BACKOFF_MAX_SECONDS, BATCH_BACKOFF_BASE_SECONDS * 2**attempt)
+    time.sleep(random.uniform(0, backoff))
 
 
 def get_seasons_data_from_api() -> List[Dict[str, str]]:
@@ -33,18 +104,12 @@ def get_seasons_data_from_api() -> List[Dict[str, str]]:
     Raises:
         Exception: If the API request fails or returns a non-200 status code.
     """
-    headers = {
-        "x-rapidapi-host": "v3.football.api-sports.io",
-        "x-rapidapi-key": RAPID_API_KEY,
-    }
-
-    session = requests.Session()
     site = "https://v3.football.api-sports.io/"
 
-    response = session.get(site + "leagues", headers=headers)
+    response = HTTP_SESSION.get(site + "leagues")
 
     if response.status_code == 200:
-        return response.json()["response"]
+        return orjson.loads(response.content)["response"]
     else:
         raise Exception(f"Status code: {response.status_code}")
 
@@ -71,6 +136,8 @@ def process_json_to_dataframe(data: Dict, first_year_kept: int) -> pd.DataFrame:
                 'league_logo', 'country_name', 'country_code', 'country_flag'
                 ]
     """
+    import pandas as pd
+
     seasons = None
     seasons = pd.json_normalize(
         data,
@@ -86,46 +153,197 @@ def process_json_to_dataframe(data: Dict, first_year_kept: int) -> pd.DataFrame:
         ],
     )
 
-    seasons.columns = seasons.columns.str.replace(".", "_", regex=False)
-    seasons = seasons.infer_objects()
+    # Rename all the columns in a single pass
+    renamed_columns = {"year": "season_year", "start": "start_date", "end": "end_date"}
+    seasons = seasons.rename(
+        columns={
+            column: renamed_columns.get(column, column.replace(".", "_"))
+            for column in seasons.columns
+        }
+    )
+    # Set only the dtypes we rely on instead of inferring the dtypes of every column
+    seasons = seasons.astype({"season_year": "int32", "league_id": "int32"})
+    # Missing coverage information means we don't have the events
+    seasons["coverage_fixtures_events"] = seasons["coverage_fixtures_events"].eq(True)
 
     seasons = seasons[
         (seasons["league_type"] != "Cup")
-        & (seasons["year"] > first_year_kept)
+        & (seasons["season_year"] > first_year_kept)
         & (seasons["coverage_fixtures_events"])
     ]
-    seasons = seasons.rename(
-        columns={"year": "season_year", "start": "start_date", "end": "end_date"}
-    )
 
     # Drop duplicates as we are only interested on the latest information
     seasons = seasons.drop_duplicates(subset=["league_id", "season_year"], keep="last")
     return seasons
 
 
-def put_item(table, item: Dict, condition_expression: str) -> None:
+def get_existing_keys(table, keys: List[Dict]) -> Set[Tuple[int, int]]:
     """
-    Puts an item into a table with a condition expression.
+    Checks which of the given keys already exist in the table.
+
+    Parameters:
+    - table: Dynamodb resource of the table.
+    - keys: A list of {"league_id": ..., "season_year": ...} dictionaries.
+
+    Returns:
+        Set of (league_id, season_year) tuples which already exist in the table.
+
+    Raises:
+    - RuntimeError: If keys are still unprocessed after MAX_BATCH_ATTEMPTS attempts.
+    """
+    existing_keys = set()
+    # BatchGetItem accepts at most 100 keys per request
+    for i in range(0, len(keys), 100):
+        request_items = {
+            table.name: {
+                "Keys": keys[i : i + 100],
+                "ProjectionExpression": "league_id, season_year",
+            }
+        }
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            if attempt > 0:
+                sleep_before_retry(attempt)
+            response = get_dynamodb().batch_get_item(RequestItems=request_items)
+            for item in response["Responses"].get(table.name, []):
+                existing_keys.add((int(item["league_id"]), int(item["season_year"])))
+            request_items = response.get("UnprocessedKeys")
+            if not request_items:
+                break
+        else:
+            raise RuntimeError(
+                f"BatchGetItem keys unprocessed after {MAX_BATCH_ATTEMPTS} attempts"
+            )
+    return existing_keys
+
+
+def put_new_items(table, items: List[Dict]) -> int:
+    """
+    Puts the items which do not yet exist in the table with batched writes.
 
     Parameters:
     - table: Dynamodb resource of the table.
+    - items: A list of dictionaries representing the items to be put into the table.
+
+    Returns:
+        int: The number of new items put into the table.
+
+    Raises:
+    - RuntimeError: If items are still unprocessed after MAX_BATCH_ATTEMPTS attempts.
+    """
+    existing_keys = get_existing_keys(
+        table,
+        keys=[
+            {"league_id": item["league_id"], "season_year": item["season_year"]}
+            for item in items
+        ],
+    )
+    # Deduplicate by the primary key, BatchWriteItem fails on duplicate keys
+    new_items = {}
+    for item in items:
+        pkey = (item["league_id"], item["season_year"])
+        if pkey not in existing_keys:
+            new_items[pkey] = item
+
+    write_requests = [
+        {
+            "PutRequest": {
+                "Item": {
+                    key: TYPE_SERIALIZER.serialize(value) for key, value in item.items()
+                }
+            }
+        }
+        for item in new_items.values()
+    ]
+    logging.debug(write_requests)
+
+    # Low level client for the hot write path, resource is used elsewhere
+    dynamodb_client = get_dynamodb().meta.client
+    # BatchWriteItem accepts at most 25 items per request
+    for i in range(0, len(write_requests), 25):
+        request_items = {table.name: write_requests[i : i + 25]}
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            if attempt > 0:
+                sleep_before_retry(attempt)
+            response = dynamodb_client.batch_write_item(RequestItems=request_items)
+            request_items = response.get("UnprocessedItems")
+            if not request_items:
+                break
+        else:
+            raise RuntimeError(
+                f"BatchWriteItem items unprocessed after {MAX_BATCH_ATTEMPTS} attempts"
+            )
+    return len(write_requests)
+
+
+def put_item(client, table_name: str, item: Dict, condition_expression: str) -> bool:
+    """
+    Puts an item into a table with a condition expression.
+
+    Parameters:
+    - client: Low level dynamodb client, unlike resources clients are thread safe.
+    - table_name: Name of the table.
     - item: A dictionary representing the item to be put into the table.
     - condition_expression: A string representing the condition expression for the put operation.
 
     Returns:
-        None
+        bool: True if the item was put into the table, False if the condition failed.
 
     Raises:
     - botocore.exceptions.ClientError: If the put operation fails due to a client error, except for a ConditionalCheckFailedException.
-
-    Todo:
-    - If we fail to insert one item the whole batch / application should not fail
     """
     try:
-        table.put_item(Item=item, ConditionExpression=condition_expression)
+        client.put_item(
+            TableName=table_name,
+            Item={key: TYPE_SERIALIZER.serialize(value) for key, value in item.items()},
+            ConditionExpression=condition_expression,
+        )
     except botocore.exceptions.ClientError as e:
         if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
             raise
+        return False
+    return True
+
+
+def put_new_items_conditionally(table, items: List[Dict]) -> int:
+    """
+    Puts the items which do not yet exist in the table with concurrent conditional puts.
+
+    Parameters:
+    - table: Dynamodb resource of the table.
+    - items: A list of dictionaries representing the items to be put into the table.
+
+    Returns:
+        int: The number of new items put into the table.
+
+    Raises:
+    - RuntimeError: If putting any of the items failed. Failing items do not stop the
+      other items from being put, the error is raised after all the puts are done.
+    """
+    condition_expression = (
+        "attribute_not_exists(league_id) and attribute_not_exists(season_year)"
+    )
+    # Resources are not thread safe, the workers share the client of the resource
+    client = table.meta.client
+    with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+        futures = [
+            executor.submit(put_item, client, table.name, item, condition_expression)
+            for item in items
+        ]
+
+    n_new_items = 0
+    failures = []
+    for item, future in zip(items, futures):
+        try:
+            n_new_items += future.result()
+        except botocore.exceptions.ClientError as e:
+            logging.error(f"Failed to put item: {item}", exc_info=e)
+            failures.append(e)
+
+    if failures:
+        raise RuntimeError(
+            f"Failed to put {len(failures)} of {len(items)} items"
+        ) from failures[0]
+    return n_new_items
 
 
 def lambda_handler(event, context):
@@ -144,16 +362,18 @@ def lambda_handler(event, context):
     # to pull games from that season
     new_data["last_updated_fixtures"] = "2000-01-01"
     new_data["data_need_to_update"] = 1
-
-    for item in new_data.to_dict("records"):
-        logging.debug(item)
-        # Put item to database. If it already exists (we are already tracking the collected matches)
-        # we don't need to put it in. The condition expression checks for this
-        put_item(
-            table=SEASON_META_TABLE,
-            item=item,
-            condition_expression="attribute_not_exists(league_id) and attribute_not_exists(season_year)",
-        )
+    # Missing values come out of pandas as float NaN which DynamoDB does not accept,
+    # store them as NULL instead
+    new_data = new_data.astype(object).where(new_data.notna(), None)
+
+    # Put only the new items to database. If the item already exists (we are already
+    # tracking the collected matches) we don't need to put it in.
+    put_items = put_new_items_conditionally if CONDITIONAL_WRITES else put_new_items
+    n_new_items = put_items(
+        table=get_dynamodb().Table(SEASON_META_TABLE),
+        items=new_data.to_dict("records"),
+    )
+    logging.info(f"Imported {n_new_items} new seasons")
 
     return {"statusCode": 200, "body": "Meta information succesfully imported"}
 
@@ -0,0 +1,128 @@
+"""
+Tests for the rate and concurrency limiters of the fetch_fixtures_and_teams lambda.
+"""
+
+import asyncio
+import importlib.util
+import time
+from pathlib import Path
+
+import pytest
+
+APP_PATH = (
+    Path(__file__).parents[1] / "src/data_import/fetch_fixtures_and_teams/app.py"
+)
+
+# Both lambdas have an app.py module so load this one under its own name
+spec = importlib.util.spec_from_file_location("fetch_fixtures_and_teams_app", APP_PATH)
+app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app)
+
+
+async def make_calls(limiter, results):
+    for latency_seconds, status_code in results:
+        await limiter.acquire()
+        await limiter.release(latency_seconds, status_code)
+
+
+def test_concurrency_limiter_starts_from_max_limit():
+    limiter = app.AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=4, target_latency_seconds=1
+    )
+    assert limiter.limit == 4
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503, None])
+def test_concurrency_limiter_halves_on_errors(status_code):
+    limiter = app.AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=8, target_latency_seconds=1
+    )
+    asyncio.run(make_calls(limiter, [(0.1, status_code)]))
+    assert limiter.limit == 4
+
+    asyncio.run(make_calls(limiter, [(0.1, status_code)] * 5))
+    assert limiter.limit == 1
+
+
+def test_concurrency_limiter_increases_after_fast_window():
+    limiter = app.AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=4, target_latency_seconds=1, window_size=3
+    )
+    asyncio.run(make_calls(limiter, [(0.1, 429), (0.1, 429)]))
+    assert limiter.limit == 1
+
+    asyncio.run(make_calls(limiter, [(0.1, 200)] * 2))
+    assert limiter.limit == 1
+    asyncio.run(make_calls(limiter, [(0.1, 200)]))
+    assert limiter.limit == 2
+
+    asyncio.run(make_calls(limiter, [(0.1, 200)] * 30))
+    assert limiter.limit == 4
+
+
+def test_concurrency_limiter_does_not_increase_when_slow():
+    limiter = app.AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=4, target_latency_seconds=1, window_size=3
+    )
+    asyncio.run(make_calls(limiter, [(0.1, 429), (5, 200), (5, 200), (5, 200)]))
+    assert limiter.limit == 2
+
+
+def test_concurrency_limiter_error_resets_window():
+    limiter = app.AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=4, target_latency_seconds=1, window_size=3
+    )
+    asyncio.run(
+        make_calls(limiter, [(0.1, 429), (0.1, 200), (0.1, 200), (0.1, 502)])
+    )
+    assert limiter.limit == 1
+    asyncio.run(make_calls(limiter, [(0.1, 200)] * 2))
+    assert limiter.limit == 1
+
+
+def test_rate_limiter_waits_when_window_is_full():
+    limiter = app.RateLimiter(max_calls=2, period_seconds=60)
+    asyncio.run(limiter.wait_if_throttled())
+    asyncio.run(limiter.wait_if_throttled())
+    assert 59 < limiter.seconds_to_wait() <= 60
+
+
+def test_rate_limiter_waits_for_reset_only_without_budget():
+    limiter = app.RateLimiter(max_calls=10)
+    limiter.update_from_headers(
+        {"x-ratelimit-requests-remaining": "5", "x-ratelimit-requests-reset": "100"}
+    )
+    assert limiter.seconds_to_wait() == 0
+
+    limiter.update_from_headers({"x-ratelimit-requests-remaining": "0"})
+    assert 99 < limiter.seconds_to_wait() <= 100
+
+
+def test_rate_limiter_raises_when_reset_is_after_deadline():
+    limiter = app.RateLimiter(max_calls=10)
+    limiter.update_from_headers(
+        {"x-ratelimit-requests-remaining": "0", "x-ratelimit-requests-reset": "3600"}
+    )
+    with pytest.raises(app.RateLimitExhausted):
+        asyncio.run(limiter.wait_if_throttled(deadline=time.monotonic() + 60))
+    assert not limiter.call_times
+
+
+def test_get_data_does_not_adapt_limit_without_a_request(monkeypatch):
+    concurrency_limiter = app.AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=8, target_latency_seconds=1
+    )
+    rate_limiter = app.RateLimiter(max_calls=10)
+    rate_limiter.update_from_headers(
+        {"x-ratelimit-requests-remaining": "0", "x-ratelimit-requests-reset": "3600"}
+    )
+    monkeypatch.setattr(app, "CONCURRENCY_LIMITER", concurrency_limiter)
+    monkeypatch.setattr(app, "RATE_LIMITER", rate_limiter)
+
+    for _ in range(3):
+        with pytest.raises(app.RateLimitExhausted):
+            asyncio.run(
+                app.get_data(39, 2023, "fixtures", deadline=time.monotonic() + 60)
+            )
+    assert concurrency_limiter.limit == 8
+    assert concurrency_limiter.in_flight == 0